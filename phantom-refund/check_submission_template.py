@@ -3,7 +3,15 @@
 """
 Template for the maintainer's local submission checker.
 
-Usage (maintainer only, with local copy):
+Usage:
+
+    python check_submission_template.py submissions/<handle>.txt
+
+By default the answer is derived locally: mini_evm.py runs the bytecode,
+calldata and initial storage published in README.md and the final value of
+slot 0x42 becomes ANSWER. It is only ever hashed, never printed.
+
+To check against a hand-computed answer instead (maintainer only, with local copy):
 
     cp check_submission_template.py check_submission_local.py
     # edit CORRECT_ANSWER in check_submission_local.py (do NOT commit)
@@ -15,8 +23,22 @@ Do NOT commit the file with the real CORRECT_ANSWER to the public repo.
 import sys
 import hashlib
 
+from mini_evm import EVMError, readme_puzzle, run
+
 # Replace this in your local copy (check_submission_local.py), NOT in git.
+# Left as is, the answer is computed from README.md with mini_evm.py.
 CORRECT_ANSWER = "REPLACE_ME_WITH_HEX_ANSWER" 
+ANSWER_SLOT = 0x42
+
+
+def derive_answer() -> str:
+    """
+    Execute the README puzzle and return slot 0x42 as a minimal lowercase hex
+    string ("0x" + hex digits), the same form contestants hash.
+    """
+    program, calldata, storage = readme_puzzle()
+    result = run(program, calldata, storage)
+    return hex(result.storage.get(ANSWER_SLOT, 0))
 
 
 def expected_hash(handle: str) -> str:
@@ -28,9 +50,14 @@ def expected_hash(handle: str) -> str:
 
 
 def main():
+    global CORRECT_ANSWER
     if CORRECT_ANSWER == "REPLACE_ME_WITH_HEX_ANSWER":
-        print("ERROR: Please set CORRECT_ANSWER in your local copy (check_submission_local.py).")
-        sys.exit(1)
+        try:
+            CORRECT_ANSWER = derive_answer()
+        except (EVMError, OSError, StopIteration, ValueError) as e:
+            print(f"ERROR: could not derive the answer from README.md ({e}); "
+                  "set CORRECT_ANSWER in your local copy (check_submission_local.py).")
+            sys.exit(1)
 
     if len(sys.argv) != 2:
         print("Usage: python check_submission_local.py submissions/<handle>.txt")
@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+mini_evm.py
+
+A small, dependency-free EVM interpreter for bytecode puzzles like this one.
+
+Usage (from repo root):
+
+    python phantom-refund/mini_evm.py <hex bytecode> [--calldata HEX] [--storage SLOT=VALUE ...]
+    python phantom-refund/mini_evm.py --bench
+
+It runs a single call frame: the core arithmetic/bitwise/comparison set,
+KECCAK256, memory, storage, calldata, the block/tx environment (fixed values),
+PUSH0..PUSH32, DUP/SWAP, LOG0..LOG4, JUMP/JUMPI, RETURN/REVERT/INVALID and
+SELFDESTRUCT. Gas is not metered; a step limit stops runaway loops instead.
+Opcodes that would need other accounts (CALL, CREATE, EXTCODE*, ...) raise
+EVMError.
+
+How it is built:
+- JUMPDEST analysis happens once per program: a bitmap marks valid jump targets
+  (bytes inside PUSH data are never targets), and PUSH immediates are decoded
+  up front so a PUSH at run time is a list lookup.
+- Dispatch is a 256-entry table of handler functions; each takes the machine,
+  its stack (a plain list of ints) and the pc, and returns the next pc.
+- Storage writes are applied to a working copy and committed only if the frame
+  halts successfully; REVERT and exceptional halts roll them back.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+README_PATH = Path(__file__).resolve().parent / "README.md"
+
+UINT256 = (1 << 256) - 1
+SIGN_BIT = 1 << 255
+STACK_LIMIT = 1024
+MEMORY_LIMIT = 1 << 26  # stands in for the gas a real node would run out of
+HALT = -1
+
+
+class EVMError(Exception):
+    """Raised for bytecode this interpreter cannot run (unsupported opcodes)."""
+
+
+# ----------------------------
+# Keccak-256 (the pre-NIST padding the EVM uses; hashlib's sha3_256 differs)
+# ----------------------------
+
+_KECCAK_RC = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+# rotation offset of lane (x, y), indexed [x][y]
+_KECCAK_ROT = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14],
+]
+_MASK64 = (1 << 64) - 1
+
+
+def _keccak_f(A):
+    for rc in _KECCAK_RC:
+        C = [A[x] ^ A[x + 5] ^ A[x + 10] ^ A[x + 15] ^ A[x + 20] for x in range(5)]
+        for x in range(5):
+            d = C[(x - 1) % 5] ^ (((C[(x + 1) % 5] << 1) | (C[(x + 1) % 5] >> 63)) & _MASK64)
+            for y in range(0, 25, 5):
+                A[x + y] ^= d
+        B = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                v, n = A[x + 5 * y], _KECCAK_ROT[x][y]
+                B[y + 5 * ((2 * x + 3 * y) % 5)] = ((v << n) | (v >> (64 - n))) & _MASK64 if n else v
+        for y in range(0, 25, 5):
+            row = B[y:y + 5]
+            for x in range(5):
+                A[x + y] = row[x] ^ (~row[(x + 1) % 5] & row[(x + 2) % 5])
+        A[0] ^= rc
+
+
+def keccak256(data: bytes) -> bytes:
+    rate = 136
+    padded = bytearray(data) + b"\x01"
+    padded += bytes(-len(padded) % rate)
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for off in range(0, len(padded), rate):
+        for i in range(rate // 8):
+            state[i] ^= int.from_bytes(padded[off + 8 * i:off + 8 * i + 8], "little")
+        _keccak_f(state)
+    return b"".join(state[i].to_bytes(8, "little") for i in range(4))
+
+
+# ----------------------------
+# Program analysis
+# ----------------------------
+
+class Program:
+    """Bytecode plus its one-time analysis: JUMPDEST bitmap and decoded PUSH immediates."""
+
+    def __init__(self, code: bytes):
+        self.code = bytes(code)
+        n = len(self.code)
+        self.jumpdests = bytearray(n)
+        self.immediates = [0] * n
+        pc = 0
+        while pc < n:
+            op = self.code[pc]
+            if op == 0x5B:
+                self.jumpdests[pc] = 1
+            elif 0x60 <= op <= 0x7F:
+                size = op - 0x5F
+                # data running past the end of the code reads as zero bytes
+                data = self.code[pc + 1:pc + 1 + size].ljust(size, b"\x00")
+                self.immediates[pc] = int.from_bytes(data, "big")
+                pc += size
+            pc += 1
+
+    @classmethod
+    def from_hex(cls, text: str) -> "Program":
+        return cls(bytes.fromhex(_strip_hex(text)))
+
+
+def _strip_hex(text: str) -> str:
+    text = "".join(text.split())
+    return text[2:] if text[:2].lower() == "0x" else text
+
+
+# ----------------------------
+# Machine state and result
+# ----------------------------
+
+class Result:
+    """Outcome of one run.
+
+    status is "stop", "return", "selfdestruct" (successful halts), "revert",
+    "invalid" (INVALID, bad jump, stack under/overflow) or "step-limit".
+    `storage` is the committed storage after the run: the initial storage
+    again unless the run succeeded.
+    """
+
+    def __init__(self, status, storage, return_data=b"", logs=(), steps=0, pc=0, error=None, destroyed=False):
+        self.status = status
+        self.storage = storage
+        self.return_data = return_data
+        self.logs = list(logs)
+        self.steps = steps
+        self.pc = pc
+        self.error = error
+        self.destroyed = destroyed
+
+    @property
+    def success(self):
+        return self.status in ("stop", "return", "selfdestruct")
+
+    def __repr__(self):
+        return f"Result(status={self.status!r}, steps={self.steps}, storage={len(self.storage)} slots)"
+
+
+class _Halt(Exception):
+    def __init__(self, status, error=None):
+        self.status = status
+        self.error = error
+
+
+class Machine:
+    """One call frame. `env` overrides the fixed environment values (see DEFAULT_ENV)."""
+
+    __slots__ = ("program", "calldata", "storage", "memory", "return_data", "logs", "status", "env",
+                 "created", "eip6780", "destroyed")
+
+    def __init__(self, program, calldata=b"", storage=None, env=None, created=False, eip6780=True):
+        self.program = program
+        self.calldata = bytes(calldata)
+        self.storage = dict(storage or {})
+        self.memory = bytearray()
+        self.return_data = b""
+        self.logs = []
+        self.status = None
+        self.env = dict(DEFAULT_ENV, **(env or {}))
+        self.created = created
+        self.eip6780 = eip6780
+        self.destroyed = False
+
+    def clone(self):
+        """Independent copy of the mutable state (memory, storage, logs); the program is shared."""
+        c = Machine.__new__(Machine)
+        for name in self.__slots__:
+            setattr(c, name, getattr(self, name))
+        c.memory = bytearray(self.memory)
+        c.storage = dict(self.storage)
+        c.logs = list(self.logs)
+        return c
+
+
+DEFAULT_ENV = {
+    "address": 0x1000, "caller": 0x2000, "origin": 0x2000, "callvalue": 0, "balance": 0,
+    "gasprice": 0, "coinbase": 0, "timestamp": 0, "number": 0, "prevrandao": 0, "gaslimit": 30_000_000,
+    "chainid": 1, "basefee": 0, "gas": 30_000_000,
+}
+
+
+def _mem(m, off, size):
+    """Grow memory (in 32-byte words) to cover [off, off+size)."""
+    if size:
+        end = off + size
+        if end > MEMORY_LIMIT:
+            raise _Halt("invalid", f"memory access beyond {MEMORY_LIMIT} bytes")
+        if end > len(m.memory):
+            m.memory.extend(bytes((end + 31) // 32 * 32 - len(m.memory)))
+
+
+def _signed(v):
+    return v - (1 << 256) if v & SIGN_BIT else v
+
+
+# ----------------------------
+# Opcode handlers
+# ----------------------------
+# Each handler is h(m, s, pc) -> next pc (HALT to stop). Stack underflow shows up
+# as IndexError from s.pop() and is turned into an exceptional halt by run().
+
+def op_stop(m, s, pc):
+    m.status = "stop"
+    return HALT
+
+def op_add(m, s, pc):
+    s.append((s.pop() + s.pop()) & UINT256)
+    return pc + 1
+
+def op_mul(m, s, pc):
+    s.append((s.pop() * s.pop()) & UINT256)
+    return pc + 1
+
+def op_sub(m, s, pc):
+    a = s.pop()
+    s.append((a - s.pop()) & UINT256)
+    return pc + 1
+
+def op_div(m, s, pc):
+    a, b = s.pop(), s.pop()
+    s.append(a // b if b else 0)
+    return pc + 1
+
+def op_sdiv(m, s, pc):
+    a, b = _signed(s.pop()), _signed(s.pop())
+    if b == 0:
+        s.append(0)
+    else:
+        q = abs(a) // abs(b)
+        s.append((-q if (a < 0) != (b < 0) else q) & UINT256)
+    return pc + 1
+
+def op_mod(m, s, pc):
+    a, b = s.pop(), s.pop()
+    s.append(a % b if b else 0)
+    return pc + 1
+
+def op_smod(m, s, pc):
+    a, b = _signed(s.pop()), _signed(s.pop())
+    if b == 0:
+        s.append(0)
+    else:
+        r = abs(a) % abs(b)
+        s.append((-r if a < 0 else r) & UINT256)
+    return pc + 1
+
+def op_addmod(m, s, pc):
+    a, b, n = s.pop(), s.pop(), s.pop()
+    s.append((a + b) % n if n else 0)
+    return pc + 1
+
+def op_mulmod(m, s, pc):
+    a, b, n = s.pop(), s.pop(), s.pop()
+    s.append((a * b) % n if n else 0)
+    return pc + 1
+
+def op_exp(m, s, pc):
+    a, b = s.pop(), s.pop()
+    s.append(pow(a, b, 1 << 256))
+    return pc + 1
+
+def op_signextend(m, s, pc):
+    b, x = s.pop(), s.pop()
+    if b < 31:
+        bit = 8 * b + 7
+        mask = (1 << bit) - 1
+        x = (x | ~mask) & UINT256 if x >> bit & 1 else x & mask
+    s.append(x)
+    return pc + 1
+
+def op_lt(m, s, pc):
+    a = s.pop()
+    s.append(1 if a < s.pop() else 0)
+    return pc + 1
+
+def op_gt(m, s, pc):
+    a = s.pop()
+    s.append(1 if a > s.pop() else 0)
+    return pc + 1
+
+def op_slt(m, s, pc):
+    a = _signed(s.pop())
+    s.append(1 if a < _signed(s.pop()) else 0)
+    return pc + 1
+
+def op_sgt(m, s, pc):
+    a = _signed(s.pop())
+    s.append(1 if a > _signed(s.pop()) else 0)
+    return pc + 1
+
+def op_eq(m, s, pc):
+    s.append(1 if s.pop() == s.pop() else 0)
+    return pc + 1
+
+def op_iszero(m, s, pc):
+    s.append(0 if s.pop() else 1)
+    return pc + 1
+
+def op_and(m, s, pc):
+    s.append(s.pop() & s.pop())
+    return pc + 1
+
+def op_or(m, s, pc):
+    s.append(s.pop() | s.pop())
+    return pc + 1
+
+def op_xor(m, s, pc):
+    s.append(s.pop() ^ s.pop())
+    return pc + 1
+
+def op_not(m, s, pc):
+    s.append(s.pop() ^ UINT256)
+    return pc + 1
+
+def op_byte(m, s, pc):
+    i, x = s.pop(), s.pop()
+    s.append(x >> (8 * (31 - i)) & 0xFF if i < 32 else 0)
+    return pc + 1
+
+def op_shl(m, s, pc):
+    n, x = s.pop(), s.pop()
+    s.append((x << n) & UINT256 if n < 256 else 0)
+    return pc + 1
+
+def op_shr(m, s, pc):
+    n, x = s.pop(), s.pop()
+    s.append(x >> n if n < 256 else 0)
+    return pc + 1
+
+def op_sar(m, s, pc):
+    n, x = s.pop(), _signed(s.pop())
+    s.append((x >> min(n, 256)) & UINT256)
+    return pc + 1
+
+def op_keccak256(m, s, pc):
+    off, size = s.pop(), s.pop()
+    _mem(m, off, size)
+    s.append(int.from_bytes(keccak256(bytes(m.memory[off:off + size])), "big"))
+    return pc + 1
+
+def _env_op(key):
+    def op(m, s, pc):
+        s.append(m.env[key])
+        return pc + 1
+    op.__name__ = f"op_{key}"
+    return op
+
+def op_balance(m, s, pc):
+    s.append(m.env["balance"] if s.pop() == m.env["address"] else 0)
+    return pc + 1
+
+def op_calldataload(m, s, pc):
+    off = s.pop()
+    s.append(int.from_bytes(m.calldata[off:off + 32].ljust(32, b"\x00"), "big") if off < len(m.calldata) else 0)
+    return pc + 1
+
+def op_calldatasize(m, s, pc):
+    s.append(len(m.calldata))
+    return pc + 1
+
+def _copy_op(source):
+    def op(m, s, pc):
+        dst, off, size = s.pop(), s.pop(), s.pop()
+        _mem(m, dst, size)
+        data = source(m)
+        m.memory[dst:dst + size] = data[off:off + size].ljust(size, b"\x00") if off < len(data) else bytes(size)
+        return pc + 1
+    return op
+
+op_calldatacopy = _copy_op(lambda m: m.calldata)
+op_codecopy = _copy_op(lambda m: m.program.code)
+
+def op_codesize(m, s, pc):
+    s.append(len(m.program.code))
+    return pc + 1
+
+def op_returndatasize(m, s, pc):
+    s.append(0)  # no sub-calls, so never any return data
+    return pc + 1
+
+def op_pop(m, s, pc):
+    s.pop()
+    return pc + 1
+
+def op_mload(m, s, pc):
+    off = s.pop()
+    _mem(m, off, 32)
+    s.append(int.from_bytes(m.memory[off:off + 32], "big"))
+    return pc + 1
+
+def op_mstore(m, s, pc):
+    off, v = s.pop(), s.pop()
+    _mem(m, off, 32)
+    m.memory[off:off + 32] = v.to_bytes(32, "big")
+    return pc + 1
+
+def op_mstore8(m, s, pc):
+    off, v = s.pop(), s.pop()
+    _mem(m, off, 1)
+    m.memory[off] = v & 0xFF
+    return pc + 1
+
+def op_sload(m, s, pc):
+    s.append(m.storage.get(s.pop(), 0))
+    return pc + 1
+
+def op_sstore(m, s, pc):
+    key, v = s.pop(), s.pop()
+    m.storage[key] = v
+    return pc + 1
+
+def op_jump(m, s, pc):
+    dest = s.pop()
+    if dest >= len(m.program.jumpdests) or not m.program.jumpdests[dest]:
+        raise _Halt("invalid", f"bad jump destination 0x{dest:x} at pc 0x{pc:x}")
+    return dest
+
+def op_jumpi(m, s, pc):
+    dest, cond = s.pop(), s.pop()
+    if not cond:
+        return pc + 1
+    if dest >= len(m.program.jumpdests) or not m.program.jumpdests[dest]:
+        raise _Halt("invalid", f"bad jump destination 0x{dest:x} at pc 0x{pc:x}")
+    return dest
+
+def op_pc(m, s, pc):
+    s.append(pc)
+    return pc + 1
+
+def op_msize(m, s, pc):
+    s.append(len(m.memory))
+    return pc + 1
+
+def op_jumpdest(m, s, pc):
+    return pc + 1
+
+def op_push0(m, s, pc):
+    s.append(0)
+    return pc + 1
+
+def _push_op(size):
+    def op(m, s, pc):
+        s.append(m.program.immediates[pc])
+        return pc + 1 + size
+    op.__name__ = f"op_push{size}"
+    return op
+
+def _dup_op(n):
+    def op(m, s, pc):
+        s.append(s[-n])
+        return pc + 1
+    op.__name__ = f"op_dup{n}"
+    return op
+
+def _swap_op(n):
+    def op(m, s, pc):
+        s[-1], s[-1 - n] = s[-1 - n], s[-1]
+        return pc + 1
+    op.__name__ = f"op_swap{n}"
+    return op
+
+def _log_op(n):
+    def op(m, s, pc):
+        off, size = s.pop(), s.pop()
+        topics = [s.pop() for _ in range(n)]
+        _mem(m, off, size)
+        m.logs.append((topics, bytes(m.memory[off:off + size])))
+        return pc + 1
+    op.__name__ = f"op_log{n}"
+    return op
+
+def op_return(m, s, pc):
+    off, size = s.pop(), s.pop()
+    _mem(m, off, size)
+    m.return_data = bytes(m.memory[off:off + size])
+    m.status = "return"
+    return HALT
+
+def op_revert(m, s, pc):
+    off, size = s.pop(), s.pop()
+    _mem(m, off, size)
+    m.return_data = bytes(m.memory[off:off + size])
+    m.status = "revert"
+    return HALT
+
+def op_invalid(m, s, pc):
+    raise _Halt("invalid", f"INVALID (0xfe) at pc 0x{pc:x}")
+
+def op_selfdestruct(m, s, pc):
+    s.pop()  # beneficiary; there are no other accounts to credit
+    # EIP-6780 (Cancun): the account (and its storage) is only deleted when it was
+    # created in this same transaction; before Cancun it always was.
+    m.destroyed = m.created or not m.eip6780
+    m.status = "selfdestruct"
+    return HALT
+
+
+OPCODES = {
+    0x00: ("STOP", op_stop), 0x01: ("ADD", op_add), 0x02: ("MUL", op_mul), 0x03: ("SUB", op_sub),
+    0x04: ("DIV", op_div), 0x05: ("SDIV", op_sdiv), 0x06: ("MOD", op_mod), 0x07: ("SMOD", op_smod),
+    0x08: ("ADDMOD", op_addmod), 0x09: ("MULMOD", op_mulmod), 0x0A: ("EXP", op_exp),
+    0x0B: ("SIGNEXTEND", op_signextend),
+    0x10: ("LT", op_lt), 0x11: ("GT", op_gt), 0x12: ("SLT", op_slt), 0x13: ("SGT", op_sgt),
+    0x14: ("EQ", op_eq), 0x15: ("ISZERO", op_iszero), 0x16: ("AND", op_and), 0x17: ("OR", op_or),
+    0x18: ("XOR", op_xor), 0x19: ("NOT", op_not), 0x1A: ("BYTE", op_byte), 0x1B: ("SHL", op_shl),
+    0x1C: ("SHR", op_shr), 0x1D: ("SAR", op_sar),
+    0x20: ("KECCAK256", op_keccak256),
+    0x30: ("ADDRESS", _env_op("address")), 0x31: ("BALANCE", op_balance), 0x32: ("ORIGIN", _env_op("origin")),
+    0x33: ("CALLER", _env_op("caller")), 0x34: ("CALLVALUE", _env_op("callvalue")),
+    0x35: ("CALLDATALOAD", op_calldataload), 0x36: ("CALLDATASIZE", op_calldatasize),
+    0x37: ("CALLDATACOPY", op_calldatacopy), 0x38: ("CODESIZE", op_codesize), 0x39: ("CODECOPY", op_codecopy),
+    0x3A: ("GASPRICE", _env_op("gasprice")), 0x3D: ("RETURNDATASIZE", op_returndatasize),
+    0x41: ("COINBASE", _env_op("coinbase")), 0x42: ("TIMESTAMP", _env_op("timestamp")),
+    0x43: ("NUMBER", _env_op("number")), 0x44: ("PREVRANDAO", _env_op("prevrandao")),
+    0x45: ("GASLIMIT", _env_op("gaslimit")), 0x46: ("CHAINID", _env_op("chainid")),
+    0x47: ("SELFBALANCE", _env_op("balance")), 0x48: ("BASEFEE", _env_op("basefee")),
+    0x50: ("POP", op_pop), 0x51: ("MLOAD", op_mload), 0x52: ("MSTORE", op_mstore), 0x53: ("MSTORE8", op_mstore8),
+    0x54: ("SLOAD", op_sload), 0x55: ("SSTORE", op_sstore), 0x56: ("JUMP", op_jump), 0x57: ("JUMPI", op_jumpi),
+    0x58: ("PC", op_pc), 0x59: ("MSIZE", op_msize), 0x5A: ("GAS", _env_op("gas")), 0x5B: ("JUMPDEST", op_jumpdest),
+    0x5F: ("PUSH0", op_push0),
+    0xF3: ("RETURN", op_return), 0xFD: ("REVERT", op_revert), 0xFE: ("INVALID", op_invalid),
+    0xFF: ("SELFDESTRUCT", op_selfdestruct),
+}
+for _n in range(1, 33):
+    OPCODES[0x5F + _n] = (f"PUSH{_n}", _push_op(_n))
+for _n in range(1, 17):
+    OPCODES[0x7F + _n] = (f"DUP{_n}", _dup_op(_n))
+    OPCODES[0x8F + _n] = (f"SWAP{_n}", _swap_op(_n))
+for _n in range(5):
+    OPCODES[0xA0 + _n] = (f"LOG{_n}", _log_op(_n))
+
+OPCODE_NAMES = {op: name for op, (name, _) in OPCODES.items()}
+
+
+def _unsupported(m, s, pc):
+    op = m.program.code[pc]
+    raise EVMError(f"unsupported opcode 0x{op:02x} at pc 0x{pc:x}")
+
+
+DISPATCH = [_unsupported] * 256
+for _op, (_, _handler) in OPCODES.items():
+    DISPATCH[_op] = _handler
+
+
+# ----------------------------
+# Running
+# ----------------------------
+
+def run(program, calldata=b"", storage=None, env=None, created=False, eip6780=True, max_steps=10_000_000):
+    """Execute `program` (a Program or raw bytes) once and return a Result.
+
+    `storage` is the initial {slot: value} map and is not modified. With
+    created=True the account counts as created in this transaction, which
+    matters for SELFDESTRUCT (see op_selfdestruct); eip6780=False selects the
+    pre-Cancun behaviour.
+    """
+    if not isinstance(program, Program):
+        program = Program(program)
+    initial = dict(storage or {})
+    m = Machine(program, calldata, initial, env, created, eip6780)
+    code, table, s = program.code, DISPATCH, []
+    n = len(code)
+    pc = steps = 0
+    status = error = None
+    try:
+        while pc != HALT:
+            if pc >= n:
+                m.status = "stop"  # running off the end is an implicit STOP
+                break
+            if steps >= max_steps:
+                raise _Halt("step-limit", f"stopped after {steps} steps")
+            steps += 1
+            pc = table[code[pc]](m, s, pc)
+            if len(s) > STACK_LIMIT:
+                raise _Halt("invalid", f"stack overflow at pc 0x{pc:x}")
+        status = m.status
+    except _Halt as h:
+        status, error = h.status, h.error
+    except IndexError:
+        status, error = "invalid", f"stack underflow at pc 0x{pc:x}"
+    if status in ("stop", "return", "selfdestruct"):
+        final = {} if m.destroyed else {k: v for k, v in m.storage.items() if v}
+    else:
+        final = {k: v for k, v in initial.items() if v}
+    return Result(status, final, m.return_data, m.logs if status != "revert" else (), steps,
+                  pc, error, m.destroyed)
+
+
+def run_segment(m, s, pc, steps=0, max_steps=10_000_000, stop_ops=frozenset(), counts=None, branches=None):
+    """Instrumented stepping for tools built on top of run().
+
+    Executes machine `m` with stack `s` from `pc` until it halts or reaches an opcode
+    in `stop_ops`, which is left unexecuted. Returns (pc, steps, status, error) with
+    status None when stopped at a stop op. If given, `counts` (a 256-entry list)
+    accumulates executed opcodes and `branches` (a list) receives (pc, taken) for
+    every JUMPI executed.
+    """
+    code, table = m.program.code, DISPATCH
+    n = len(code)
+    try:
+        while pc != HALT:
+            if pc >= n:
+                m.status = "stop"
+                break
+            op = code[pc]
+            if op in stop_ops:
+                return pc, steps, None, None
+            if steps >= max_steps:
+                raise _Halt("step-limit", f"stopped after {steps} steps")
+            steps += 1
+            if counts is not None:
+                counts[op] += 1
+            if op == 0x57 and branches is not None:
+                branches.append((pc, len(s) >= 2 and s[-2] != 0))
+            pc = table[op](m, s, pc)
+            if len(s) > STACK_LIMIT:
+                raise _Halt("invalid", f"stack overflow at pc 0x{pc:x}")
+        return pc, steps, m.status, None
+    except _Halt as h:
+        return pc, steps, h.status, h.error
+    except IndexError:
+        return pc, steps, "invalid", f"stack underflow at pc 0x{pc:x}"
+
+
+def disassemble(program):
+    """[(pc, name, immediate or None)] for every instruction."""
+    if not isinstance(program, Program):
+        program = Program(program)
+    out, pc, code = [], 0, program.code
+    while pc < len(code):
+        op = code[pc]
+        name = OPCODE_NAMES.get(op, f"0x{op:02x}")
+        if 0x60 <= op <= 0x7F:
+            out.append((pc, name, program.immediates[pc]))
+            pc += op - 0x5E
+        else:
+            out.append((pc, name, None))
+            pc += 1
+    return out
+
+
+# ----------------------------
+# Puzzle inputs from README.md
+# ----------------------------
+
+def _code_block_after(lines, heading):
+    i = next(i for i, ln in enumerate(lines) if ln.startswith("#") and heading in ln)
+    start = next(j for j in range(i + 1, len(lines)) if lines[j].strip().startswith("```"))
+    end = next(j for j in range(start + 1, len(lines)) if lines[j].strip().startswith("```"))
+    return "".join(lines[start + 1:end]).strip()
+
+
+def readme_puzzle(path=README_PATH):
+    """(Program, calldata bytes, initial storage) as published in the puzzle README."""
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    code = _code_block_after(lines, "Runtime Bytecode")
+    calldata = bytes.fromhex(_strip_hex(_code_block_after(lines, "Calldata")))
+    i = next(i for i, ln in enumerate(lines) if ln.startswith("#") and "Initial Storage" in ln)
+    storage = {}
+    for ln in lines[i + 1:]:
+        if ln.startswith("#"):
+            break
+        cells = [c.strip().strip("`") for c in ln.strip().strip("|").split("|")]
+        if len(cells) == 2 and cells[0].lower().startswith("0x"):
+            storage[int(cells[0], 16)] = int(cells[1], 16)
+    return Program.from_hex(code), calldata, storage
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+
+def loop_program(iterations):
+    """Bytecode counting down from `iterations`, with an SSTORE/SLOAD and some arithmetic per pass."""
+    n = iterations.to_bytes(4, "big")
+    body = bytes([
+        0x63, *n,              # PUSH4 n
+        0x5B,                  # 0x05: JUMPDEST            [i]
+        0x80, 0x15,            # DUP1 ISZERO               [i, i==0]
+        0x60, 0x1B, 0x57,      # PUSH1 0x1b JUMPI          [i]
+        0x80, 0x60, 0x00, 0x54,  # DUP1 PUSH1 0 SLOAD      [i, i, acc]
+        0x01, 0x60, 0x00, 0x55,  # ADD PUSH1 0 SSTORE      [i]
+        0x60, 0x01, 0x90, 0x03,  # PUSH1 1 SWAP1 SUB       [i-1]
+        0x60, 0x05, 0x56,      # PUSH1 0x05 JUMP
+        0x00,                  # 0x1a: STOP (unreached)
+        0x5B, 0x00,            # 0x1b: JUMPDEST STOP
+    ])
+    return Program(body)
+
+
+def bench(iterations=200_000, repeat=3):
+    """Run loop_program and return (steps, best seconds, ops/sec)."""
+    program = loop_program(iterations)
+    best, res = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = run(program, max_steps=iterations * 20 + 10)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert res.success and res.storage.get(0) == iterations * (iterations + 1) // 2, res
+    return res.steps, best, res.steps / best
+
+
+def _parse_storage(items):
+    storage = {}
+    for item in items or ():
+        slot, _, value = item.partition("=")
+        storage[int(slot, 0)] = int(value, 0)
+    return storage
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run EVM bytecode in a single call frame.")
+    ap.add_argument("code", nargs="?", help="Hex bytecode (0x optional)")
+    ap.add_argument("--calldata", default="", help="Hex calldata")
+    ap.add_argument("--storage", nargs="*", metavar="SLOT=VALUE", help="Initial storage (ints, 0x allowed)")
+    ap.add_argument("--created", action="store_true", help="Treat the account as created in this transaction")
+    ap.add_argument("--pre-cancun", action="store_true", help="Pre-EIP-6780 SELFDESTRUCT (always deletes storage)")
+    ap.add_argument("--disasm", action="store_true", help="Print the disassembly before running")
+    ap.add_argument("--bench", action="store_true", help="Measure interpreter throughput on a looping program")
+    ap.add_argument("--iterations", type=int, default=200_000, help="Loop passes for --bench")
+    args = ap.parse_args()
+
+    if args.bench:
+        steps, best, rate = bench(args.iterations)
+        print(f"{steps} ops in {best * 1000:.1f} ms: {rate / 1e6:.2f} M ops/sec")
+        return
+    if not args.code:
+        ap.error("bytecode required (or --bench)")
+
+    program = Program.from_hex(args.code)
+    if args.disasm:
+        for pc, name, imm in disassemble(program):
+            print(f"{pc:04x}  {name}" + (f" 0x{imm:x}" if imm is not None else ""))
+    res = run(program, bytes.fromhex(_strip_hex(args.calldata)), _parse_storage(args.storage),
+              created=args.created, eip6780=not args.pre_cancun)
+    print(f"status: {res.status} after {res.steps} steps" + (f" ({res.error})" if res.error else ""))
+    if res.return_data:
+        print(f"returndata: 0x{res.return_data.hex()}")
+    for slot, value in sorted(res.storage.items()):
+        print(f"storage[0x{slot:x}] = 0x{value:x}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except EVMError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+sweep.py
+
+Run a bytecode puzzle over many calldata / initial-storage variants and report
+how execution depends on the input.
+
+Usage (from repo root):
+
+    python phantom-refund/sweep.py                          # README puzzle, calldata words 0..255
+    python phantom-refund/sweep.py --calldata-range 0:100000 --jobs 0
+    python phantom-refund/sweep.py --calldata 0x42 0x43 --storage 0x42=0,0xdeadbeef,1
+    python phantom-refund/sweep.py --code 0x6000... --calldata-random 5000 --json out.jsonl
+
+For the whole batch it prints the distinct execution paths (sequences of JUMPI
+decisions plus the halt status) with how many inputs took each, a branch
+coverage map of every JUMPI, and per-opcode counts. Final values of --slot are
+shown as fingerprints keyed with a random per-run salt, so equal values match
+within one report but cannot be recovered by hashing guesses; --reveal prints
+them in hex. With --json it writes one record per input: path id, status,
+opcode counts, branch decisions, and the storage diff against that input's
+initial storage. An author can use this to check, before publishing, that a
+puzzle has exactly one intended path.
+
+Prefix caching: execution is shared until an instruction actually reads the
+input (CALLDATALOAD/CALLDATASIZE/CALLDATACOPY, or SLOAD of a slot not yet
+written). Each such point is a node in an execution tree whose children are
+keyed by the value read, so inputs that read the same values share every
+instruction up to where they diverge. Inputs are sorted and split across a
+process pool (--jobs); each worker keeps its own tree.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from mini_evm import (DISPATCH, OPCODE_NAMES, STACK_LIMIT, EVMError, Machine, Program, _Halt, _strip_hex,
+                      disassemble, readme_puzzle, run_segment)
+
+INPUT_OPS = frozenset({0x35, 0x36, 0x37, 0x54})  # CALLDATALOAD, CALLDATASIZE, CALLDATACOPY, SLOAD
+_ARGS = {0x35: 1, 0x36: 0, 0x37: 3, 0x54: 1}  # stack operands each input op consumes
+SUCCESS = ("stop", "return", "selfdestruct")
+
+
+class _Node:
+    """Machine state stopped before an input read (or halted), plus the segment that led here."""
+
+    __slots__ = ("m", "s", "pc", "steps", "status", "error", "counts", "branches", "children")
+
+    def __init__(self, m, s, pc, steps, status, error, counts, branches):
+        self.m, self.s, self.pc, self.steps = m, s, pc, steps
+        self.status, self.error = status, error
+        self.counts = {op: n for op, n in enumerate(counts) if n}
+        self.branches = tuple(branches)
+        self.children = {}
+
+
+def _read(node, calldata, storage):
+    """The part of this input that `node`'s pending instruction reads; None if it cannot run."""
+    op, s = node.m.program.code[node.pc], node.s
+    if len(s) < _ARGS[op]:
+        return None
+    if op == 0x35:
+        off = s[-1]
+        return calldata[off:off + 32] if off < len(calldata) else b""
+    if op == 0x36:
+        return len(calldata)
+    if op == 0x37:
+        off, size = s[-2], s[-3]
+        return calldata[off:off + size] if off < len(calldata) else b""
+    slot = s[-1]
+    return node.m.storage[slot] if slot in node.m.storage else storage.get(slot, 0)
+
+
+def _advance(parent, value, calldata, max_steps):
+    """Execute the pending input instruction for an input reading `value`, then run to the next read or halt.
+
+    Every input mapping to the same `value` produces the same child, so the child is
+    computed once from whichever input gets there first.
+    """
+    m, s = parent.m.clone(), list(parent.s)
+    pc, op = parent.pc, m.program.code[parent.pc]
+    counts, branches = [0] * 256, []
+    if parent.steps >= max_steps:
+        return _Node(m, s, pc, parent.steps, "step-limit", f"stopped after {parent.steps} steps", counts, branches)
+    counts[op] += 1
+    if value is None:
+        return _Node(m, s, pc, parent.steps + 1, "invalid", f"stack underflow at pc 0x{pc:x}", counts, branches)
+    if op == 0x54:
+        s.pop()
+        s.append(value)
+    else:
+        m.calldata = calldata  # only the bytes that make up `value` are observed
+        try:
+            DISPATCH[op](m, s, pc)
+        except _Halt as h:
+            return _Node(m, s, pc, parent.steps + 1, h.status, h.error, counts, branches)
+        finally:
+            m.calldata = b""
+    if len(s) > STACK_LIMIT:  # same check run() applies after every instruction
+        return _Node(m, s, pc + 1, parent.steps + 1, "invalid", f"stack overflow at pc 0x{pc + 1:x}",
+                     counts, branches)
+    pc, steps, status, error = run_segment(m, s, pc + 1, parent.steps + 1, max_steps, INPUT_OPS,
+                                           counts, branches)
+    return _Node(m, s, pc, steps, status, error, counts, branches)
+
+
+def _root(program, max_steps, env=None, created=False, eip6780=True):
+    m = Machine(program, b"", {}, env, created, eip6780)  # storage holds this run's writes only
+    s, counts, branches = [], [0] * 256, []
+    pc, steps, status, error = run_segment(m, s, 0, 0, max_steps, INPUT_OPS, counts, branches)
+    return _Node(m, s, pc, steps, status, error, counts, branches)
+
+
+def _trace(root, calldata, storage, max_steps):
+    """Walk (and grow) the tree for one input. Returns the nodes on its path, root first."""
+    path = [root]
+    node = root
+    while node.status is None:
+        value = _read(node, calldata, storage)
+        child = node.children.get(value)
+        if child is None:
+            child = node.children[value] = _advance(node, value, calldata, max_steps)
+        path.append(child)
+        node = child
+    return path
+
+
+def _record(path, calldata, storage):
+    leaf = path[-1]
+    counts, branches = {}, []
+    for node in path:
+        for op, n in node.counts.items():
+            counts[op] = counts.get(op, 0) + n
+        branches.extend(node.branches)
+    if leaf.status in SUCCESS:
+        final = {} if leaf.m.destroyed else {**storage, **leaf.m.storage}
+    else:
+        final = storage
+    final = {k: v for k, v in final.items() if v}  # same shape as Result.storage
+    diff = {slot: (storage.get(slot, 0), final.get(slot, 0))
+            for slot in set(storage) | set(final) if storage.get(slot, 0) != final.get(slot, 0)}
+    return {
+        "calldata": calldata, "status": leaf.status, "error": leaf.error, "steps": leaf.steps,
+        "signature": (tuple(branches), leaf.status), "counts": counts, "branches": branches,
+        "final": final, "diff": diff,
+    }
+
+
+def _sweep_chunk(code, inputs, max_steps, env, created, eip6780):
+    """Worker: one execution tree over `inputs` [(index, calldata, storage)]."""
+    program = Program(code)
+    root = _root(program, max_steps, env, created, eip6780)
+    out = []
+    nodes = 0
+    for index, calldata, storage in inputs:
+        rec = _record(_trace(root, calldata, storage, max_steps), calldata, storage)
+        rec["index"] = index
+        out.append(rec)
+    executed, stack = 0, [root]
+    while stack:
+        node = stack.pop()
+        executed += sum(node.counts.values())
+        nodes += 1
+        stack.extend(node.children.values())
+    return out, executed, nodes
+
+
+def sweep(program, inputs, jobs=1, max_steps=1_000_000, env=None, created=False, eip6780=True):
+    """Run `program` over `inputs` [(calldata, storage)]. Returns (records in input order, stats)."""
+    if not isinstance(program, Program):
+        program = Program(program)
+    indexed = sorted(((i, bytes(cd), dict(st)) for i, (cd, st) in enumerate(inputs)),
+                     key=lambda it: (it[1], sorted(it[2].items())))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(indexed) < 2 * jobs:
+        results = [_sweep_chunk(program.code, indexed, max_steps, env, created, eip6780)]
+    else:
+        # contiguous chunks of the sorted inputs keep shared prefixes inside one worker's tree
+        size = -(-len(indexed) // (4 * jobs))
+        chunks = [indexed[i:i + size] for i in range(0, len(indexed), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_sweep_chunk, [program.code] * len(chunks), chunks,
+                                    [max_steps] * len(chunks), [env] * len(chunks),
+                                    [created] * len(chunks), [eip6780] * len(chunks)))
+    records = [None] * len(indexed)
+    executed = nodes = 0
+    for recs, ex, nd in results:
+        executed += ex
+        nodes += nd
+        for rec in recs:
+            records[rec["index"]] = rec
+    for rec, (_, storage) in zip(records, inputs):
+        rec["storage"] = dict(storage)
+    stats = {"inputs": len(records), "executed_steps": executed, "logical_steps": sum(r["steps"] for r in records),
+             "tree_nodes": nodes, "chunks": len(results)}
+    return records, stats
+
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def print_table(rows, headers):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    fmt = " | ".join("{:<" + str(w) + "}" for w in widths)
+    print(fmt.format(*headers))
+    print("-+-".join("-" * w for w in widths))
+    for r in rows:
+        print(fmt.format(*r))
+
+
+_FINGERPRINT_KEY = os.urandom(16)  # per run: fingerprints compare within one report only
+
+
+def _short(v, reveal):
+    """Printable slot value; without `reveal`, a keyed fingerprint that does not give the value away."""
+    if not reveal:
+        return "#" + hmac.new(_FINGERPRINT_KEY, v.to_bytes(32, "big"), hashlib.sha256).hexdigest()[:8]
+    h = f"0x{v:x}"
+    return h if len(h) <= 20 else h[:10] + "…" + h[-6:]
+
+
+def summarize(program, records):
+    """(paths, coverage, opcode totals). Paths are numbered by how many inputs took them."""
+    by_sig = {}
+    for rec in records:
+        by_sig.setdefault(rec["signature"], []).append(rec)
+    paths = sorted(by_sig.items(), key=lambda kv: -len(kv[1]))
+    for i, (_, recs) in enumerate(paths, 1):
+        for rec in recs:
+            rec["path"] = i
+
+    jumpis = [pc for pc, name, _ in disassemble(program) if name == "JUMPI"]
+    coverage = {pc: [0, 0] for pc in jumpis}
+    totals = {}
+    for rec in records:
+        seen = set(rec["branches"])
+        for pc, taken in seen:
+            coverage.setdefault(pc, [0, 0])[taken] += 1
+        for op, n in rec["counts"].items():
+            totals[op] = totals.get(op, 0) + n
+    return paths, coverage, totals
+
+
+def print_report(program, records, stats, slot, reveal=False, top_ops=15):
+    paths, coverage, totals = summarize(program, records)
+    saved = 1 - stats["executed_steps"] / stats["logical_steps"] if stats["logical_steps"] else 0.0
+    print(f"{stats['inputs']} inputs, {len(paths)} distinct paths; executed {stats['executed_steps']} of "
+          f"{stats['logical_steps']} instruction steps ({saved:.1%} shared via prefix cache, "
+          f"{stats['tree_nodes']} tree nodes, {stats['chunks']} chunks)")
+
+    print("\nPaths:")
+    rows = []
+    for i, (sig, recs) in enumerate(paths, 1):
+        branches, status = sig
+        finals = {}
+        for r in recs:
+            v = r["final"].get(slot, 0)
+            finals[v] = finals.get(v, 0) + 1
+        values = ", ".join(f"{_short(v, reveal)}×{n}" for v, n in sorted(finals.items(), key=lambda kv: -kv[1])[:3])
+        if len(finals) > 3:
+            values += f", … ({len(finals)} values)"
+        decisions = " ".join(f"{pc:x}{'T' if t else 'F'}" for pc, t in branches) or "-"
+        rows.append([i, len(recs), status, decisions, f"slot 0x{slot:x}: {values}",
+                     "…" + recs[0]["calldata"].hex()[-8:] if recs[0]["calldata"] else "(empty)"])
+    print_table(rows, ["Path", "Inputs", "Status", "JUMPI decisions (pc, T/F)", "Final value", "Example cd"])
+
+    print("\nBranch coverage (inputs per outcome):")
+    rows = [[f"0x{pc:04x}", nt, t, "both" if nt and t else "taken only" if t else "not taken only" if nt
+             else "never reached"] for pc, (nt, t) in sorted(coverage.items())]
+    if rows:
+        print_table(rows, ["JUMPI pc", "Not taken", "Taken", "Coverage"])
+    else:
+        print("(no JUMPI in program)")
+
+    print("\nOpcode counts (all inputs):")
+    rows = [[OPCODE_NAMES.get(op, f"0x{op:02x}"), n] for op, n in sorted(totals.items(), key=lambda kv: -kv[1])]
+    print_table(rows[:top_ops], ["Opcode", "Executed"])
+
+
+def write_records(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps({
+                "index": r["index"], "path": r["path"], "calldata": "0x" + r["calldata"].hex(),
+                "storage": {hex(k): hex(v) for k, v in sorted(r["storage"].items())},
+                "status": r["status"], "error": r["error"], "steps": r["steps"],
+                "opcodes": {OPCODE_NAMES.get(op, f"0x{op:02x}"): n for op, n in sorted(r["counts"].items())},
+                "branches": [[f"0x{pc:x}", t] for pc, t in r["branches"]],
+                "storage_diff": {hex(k): [hex(a), hex(b)] for k, (a, b) in sorted(r["diff"].items())},
+            }, separators=(",", ":")) + "\n")
+
+
+# ----------------------------
+# Inputs
+# ----------------------------
+
+def _word(v):
+    return (v & ((1 << 256) - 1)).to_bytes(32, "big")
+
+
+def build_inputs(args, readme_calldata, readme_storage):
+    calldatas = []
+    for item in args.calldata or ():
+        text = _strip_hex(item)
+        # a bare number is a calldata word; longer hex strings are raw calldata
+        calldatas.append(_word(int(text, 16)) if len(text) <= 64 and not args.raw_calldata
+                         else bytes.fromhex(text))
+    if args.calldata_range:
+        start, _, stop = args.calldata_range.partition(":")
+        calldatas.extend(_word(v) for v in range(int(start, 0), int(stop, 0)))
+    if args.calldata_random:
+        rng = random.Random(args.seed)
+        calldatas.extend(_word(rng.getrandbits(256)) for _ in range(args.calldata_random))
+    if not calldatas:
+        calldatas = [readme_calldata, *(_word(v) for v in range(256))]
+
+    slots, choices = [], []
+    for item in args.storage or ():
+        slot, _, values = item.partition("=")
+        slots.append(int(slot, 0))
+        choices.append([int(v, 0) for v in values.split(",") if v])
+    variants = []
+    for combo in product(*choices):
+        st = dict(readme_storage)
+        st.update(zip(slots, combo))
+        variants.append(st)
+    return [(cd, st) for cd in calldatas for st in variants]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sweep bytecode over calldata/storage variants.")
+    ap.add_argument("--code", help="Hex bytecode (default: the README puzzle)")
+    ap.add_argument("--calldata", nargs="*", metavar="HEX", help="Calldata words (or raw calldata with --raw-calldata)")
+    ap.add_argument("--raw-calldata", action="store_true", help="Treat --calldata values as raw bytes, not words")
+    ap.add_argument("--calldata-range", metavar="START:STOP", help="Every calldata word in [START, STOP)")
+    ap.add_argument("--calldata-random", type=int, default=0, metavar="N", help="N random calldata words")
+    ap.add_argument("--seed", type=int, default=0, help="Seed for --calldata-random")
+    ap.add_argument("--storage", nargs="*", metavar="SLOT=V1,V2,...",
+                    help="Initial-storage variants (cartesian product, on top of the README storage)")
+    ap.add_argument("--slot", default="0x42", help="Slot whose final values are summarized per path")
+    ap.add_argument("--reveal", action="store_true",
+                    help="Print final slot values instead of fingerprints (spoils the puzzle)")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes (0 = all cores)")
+    ap.add_argument("--max-steps", type=int, default=1_000_000, help="Per-input step limit")
+    ap.add_argument("--pre-cancun", action="store_true", help="Pre-EIP-6780 SELFDESTRUCT (always deletes storage)")
+    ap.add_argument("--json", metavar="FILE", help="Write one JSON record per input")
+    args = ap.parse_args()
+
+    program, readme_calldata, readme_storage = readme_puzzle()
+    try:
+        if args.code:
+            program, readme_storage = Program.from_hex(args.code), {}
+        inputs = build_inputs(args, readme_calldata, readme_storage)
+        slot = int(args.slot, 0)
+    except ValueError as e:
+        ap.error(str(e))
+    records, stats = sweep(program, inputs, jobs=args.jobs, max_steps=args.max_steps, eip6780=not args.pre_cancun)
+    print_report(program, records, stats, slot, args.reveal)
+    if args.json:
+        write_records(args.json, records)
+        print(f"\nWrote {len(records)} records to {args.json}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except EVMError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)